@@ -21,16 +21,20 @@ logging.basicConfig(
 logging.getLogger("googleapiclient.discovery_cache").setLevel(logging.ERROR)
 
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
+from functools import lru_cache
 import os
 import sys
 
 from dotenv import find_dotenv, load_dotenv, set_key
 import pandas as pd
 
-from modules.database import initialize_database, upsert_data
+from modules.database import get_channel_id, initialize_database, upsert_data
 from modules.scraper import YoutubeTranscriber
 
 
+@lru_cache(maxsize=1)
 def _get_api_key(api_key_name: str = "API_KEY") -> str:
     """
     Retrieve the API key from the environment or prompt the user to enter it.
@@ -75,6 +79,8 @@ def _get_yt_data(
         channel_handle: str,
         table_dir: Path,
         transcripts_dir: Path,
+        db_dir: Path,
+        max_workers: int = 6,
 ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Retrieve YouTube data for the given channel handle, and API key.
@@ -83,14 +89,19 @@ def _get_yt_data(
     :param channel_handle: YouTube channel handle.
     :param table_dir: Result tables directory.
     :param transcripts_dir: Data directory.
+    :param db_dir: Path to the SQLite database holding channel IDs from previous runs.
+    :param max_workers: Maximum number of concurrent transcript downloads.
     :return: A tuple of DataFrames containing information about the channel, the videos, and the transcripts.
     """
     youtube_scraper = YoutubeTranscriber(
         api_key=api_key,
         channel_handle=channel_handle,
         tables_dir=table_dir,
-        transcripts_dir=transcripts_dir
+        transcripts_dir=transcripts_dir,
+        max_workers=max_workers
     )
+    # Reuse the channel ID from a previous run to skip the handle lookup
+    youtube_scraper.channel_id = get_channel_id(db_dir, channel_handle)
 
     channel_df = youtube_scraper.get_channel_info()
     videos_df, transcripts_df = youtube_scraper.get_transcripts()
@@ -98,28 +109,82 @@ def _get_yt_data(
     return channel_df, videos_df, transcripts_df
 
 
+def _process_channel(
+        channel_handle: str,
+        api_key: str,
+        max_workers: int = 6,
+) -> tuple[Path, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Create the output directories for a channel and retrieve its YouTube data. Runs in a worker process when
+    multiple channels are processed.
+
+    :param channel_handle: YouTube channel handle.
+    :param api_key: API key.
+    :param max_workers: Maximum number of concurrent transcript downloads for this channel.
+    :return: A tuple of the database path and DataFrames containing information about the channel, the videos,
+        and the transcripts.
+    """
+    logging.info(f"Processing channel: {channel_handle}")
+    tables_dir, transcripts_dir, db_dir = _create_directories(channel_handle)
+
+    channel_df, videos_df, transcripts_df = _get_yt_data(
+        api_key=api_key,
+        channel_handle=channel_handle,
+        table_dir=tables_dir,
+        transcripts_dir=transcripts_dir,
+        db_dir=db_dir,
+        max_workers=max_workers,
+    )
+    return db_dir, channel_df, videos_df, transcripts_df
+
+
 def database_setup(
         db_dir: Path,
-        channel_df: pd.DataFrame = None,
-        videos_df: pd.DataFrame = None,
-        transcripts_df: pd.DataFrame = None
+        channel_df: pd.DataFrame | list[tuple] = None,
+        videos_df: pd.DataFrame | list[tuple] = None,
+        transcripts_df: pd.DataFrame | list[tuple] = None
 ) -> None:
     """
     Populates a SQLite database with channel, video, and transcript data. Existing records are updated on conflicts
     using an upsert strategy. The database is saved to "output/tubescriber.db".
 
+    :param db_dir: Path to the SQLite database directory.
+    :param channel_df: DataFrame or list of row tuples containing details about the channel.
+    :param videos_df: DataFrame or list of row tuples containing details about the channel's videos.
+    :param transcripts_df: DataFrame or list of row tuples containing details about the channel videos' transcripts.
+    """
+    with closing(initialize_database(db_dir)) as db_conn:
+        upsert_data(
+            db_conn=db_conn,
+            channel_df=channel_df,
+            videos_df=videos_df,
+            transcripts_df=transcripts_df
+        )
+
+
+def _store_channel_data(
+        channel_handle: str,
+        db_dir: Path,
+        channel_df: pd.DataFrame,
+        videos_df: pd.DataFrame,
+        transcripts_df: pd.DataFrame
+) -> None:
+    """
+    Store the data retrieved for a channel in the SQLite database.
+
+    :param channel_handle: YouTube channel handle.
     :param db_dir: Path to the SQLite database directory.
     :param channel_df: DataFrame containing details about the channel.
     :param videos_df: DataFrame containing details about the channel's videos.
     :param transcripts_df: DataFrame containing details about the channel videos' transcripts.
     """
-    db_conn = initialize_database(db_dir)
-    upsert_data(
-        db_conn=db_conn,
+    database_setup(
+        db_dir=db_dir,
         channel_df=channel_df,
         videos_df=videos_df,
         transcripts_df=transcripts_df
     )
+    logging.info(f"Finished processing channel: {channel_handle}")
 
 
 def main() -> None:
@@ -131,24 +196,28 @@ def main() -> None:
         channels = [channel.strip() for channel in channels]
         api_key = _get_api_key()
 
-        for channel in channels:
-            logging.info(f"Processing channel: {channel}")
-            tables_dir, transcripts_dir, db_dir = _create_directories(channel)
-
-            channel_df, videos_df, transcripts_df = _get_yt_data(
-                api_key=api_key,
-                channel_handle=channel,
-                table_dir=tables_dir,
-                transcripts_dir=transcripts_dir,
-            )
-
-            database_setup(
-                db_dir=db_dir,
-                channel_df=channel_df,
-                videos_df=videos_df,
-                transcripts_df=transcripts_df
-            )
-            logging.info(f"Finished processing channel: {channel}")
+        failed_channels = []
+        if len(channels) > 1:
+            # Channels are independent, so scrape them in parallel; database writes stay in this process
+            n_procs = min(4, len(channels))
+            # Split the transcript download budget across processes so all channels share one IP-safe limit
+            max_workers = max(1, 6 // n_procs)
+            with ProcessPoolExecutor(max_workers=n_procs) as executor:
+                futures = {
+                    executor.submit(_process_channel, channel, api_key, max_workers): channel for channel in channels
+                }
+                for future in as_completed(futures):
+                    channel = futures[future]
+                    try:
+                        _store_channel_data(channel, *future.result())
+                    except Exception as e:
+                        logging.exception(f"Error processing channel {channel}: {e}")
+                        failed_channels.append(channel)
+        else:
+            _store_channel_data(channels[0], *_process_channel(channels[0], api_key))
+
+        if failed_channels:
+            raise RuntimeError(f"Failed to process channels: {', '.join(failed_channels)}")
 
     except Exception as e:
         logging.exception(f"An unexpected error occurred: {e}")
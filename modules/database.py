@@ -1,3 +1,5 @@
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
 import logging
 from pathlib import Path
 import sqlite3
@@ -11,70 +13,212 @@ def initialize_database(db_path: Path) -> sqlite3.Connection:
 
     :param db_path: Path to the database file.
     :return: sqlite3.Connection: Database connection object.
+    :raises sqlite3.OperationalError: If the database cannot be opened or initialized.
     """
-    logger = logging.getLogger(__name__)
+    # Autocommit mode; transactions are managed explicitly in `upsert_data`
+    conn = sqlite3.connect(db_path, isolation_level=None, cached_statements=256)
+    cursor = conn.cursor()
+
+    # Write-ahead logging and relaxed syncing for bulk-write throughput
+    cursor.executescript("""
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA foreign_keys=ON;
+    """)
+
+    # Create Channel table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS channel (
+        channel_id TEXT PRIMARY KEY,
+        channel_handle TEXT NOT NULL,
+        channel_title TEXT NOT NULL,
+        channel_subscribers INTEGER,
+        channel_description TEXT
+    )
+    """)
+
+    # Create Video table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS video (
+        video_id TEXT PRIMARY KEY,
+        channel_id TEXT NOT NULL,
+        video_title TEXT NOT NULL,
+        video_views INTEGER,
+        video_likes INTEGER,
+        video_comments INTEGER,
+        video_engagement REAL,
+        video_published_at TEXT,
+        video_description TEXT,
+        FOREIGN KEY (channel_id) REFERENCES channel(channel_id) ON DELETE CASCADE
+    )
+    """)
+
+    # Create Transcript table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS transcript (
+        video_id TEXT PRIMARY KEY,
+        channel_id TEXT NOT NULL,
+        video_transcript TEXT NOT NULL,
+        FOREIGN KEY (video_id) REFERENCES video(video_id) ON DELETE CASCADE
+    )
+    """)
+
+    return conn
+
+
+def get_channel_id(db_path: Path, channel_handle: str) -> str | None:
+    """
+    Look up the channel ID stored for a channel handle by a previous run.
+
+    :param db_path: Path to the database file.
+    :param channel_handle: YouTube channel handle.
+    :return: The stored channel ID, or None if the handle is unknown.
+    """
+    if not Path(db_path).is_file():
+        return None
 
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # Create Channel table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS channel (
-            channel_id TEXT PRIMARY KEY,
-            channel_handle TEXT NOT NULL,
-            channel_title TEXT NOT NULL,
-            channel_subscribers INTEGER,
-            channel_description TEXT
-        )
-        """)
-
-        # Create Video table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS video (
-            video_id TEXT PRIMARY KEY,
-            channel_id TEXT NOT NULL,
-            video_title TEXT NOT NULL,
-            video_views INTEGER,
-            video_likes INTEGER,
-            video_comments INTEGER,
-            video_engagement REAL,
-            video_published_at TEXT,
-            video_description TEXT,
-            FOREIGN KEY (channel_id) REFERENCES channel(channel_id) ON DELETE CASCADE
-        )
-        """)
-
-        # Create Transcript table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS transcript (
-            video_id TEXT PRIMARY KEY,
-            channel_id TEXT NOT NULL,
-            video_transcript TEXT NOT NULL,
-            FOREIGN KEY (video_id) REFERENCES video(video_id) ON DELETE CASCADE
-        )
-        """)
-
-        conn.commit()
-        return conn
+        with closing(sqlite3.connect(db_path)) as conn:
+            row = conn.execute(
+                "SELECT channel_id FROM channel WHERE channel_handle = ?",
+                (channel_handle,)
+            ).fetchone()
+        return row[0] if row else None
+
+    except sqlite3.OperationalError:
+        return None
+
+
+CHANNEL_COLUMNS = ["channel_id", "channel_handle", "channel_title", "channel_subscribers", "channel_description"]
+VIDEO_COLUMNS = [
+    "video_id", "channel_id", "video_title", "video_views", "video_likes", "video_comments",
+    "video_engagement", "video_published_at", "video_description"
+]
+VIDEO_DTYPES = {
+    "video_views": "int64",
+    "video_likes": "int64",
+    "video_comments": "int64",
+    "video_engagement": "float64",
+}
+TRANSCRIPT_COLUMNS = ["video_id", "channel_id", "video_transcript"]
+
+CHANNEL_UPSERT_SQL = """
+INSERT INTO channel (channel_id, channel_handle, channel_title, channel_subscribers, channel_description)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(channel_id) DO UPDATE SET
+    channel_handle = excluded.channel_handle,
+    channel_title = excluded.channel_title,
+    channel_subscribers = excluded.channel_subscribers,
+    channel_description = excluded.channel_description;
+"""
+
+VIDEO_UPSERT_SQL = """
+INSERT INTO video (video_id, channel_id, video_title, video_views, video_likes, video_comments, video_engagement, video_published_at, video_description)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(video_id) DO UPDATE SET
+    video_title = excluded.video_title,
+    video_views = excluded.video_views,
+    video_likes = excluded.video_likes,
+    video_comments = excluded.video_comments,
+    video_engagement = excluded.video_engagement,
+    video_published_at = excluded.video_published_at,
+    video_description = excluded.video_description;
+"""
+
+TRANSCRIPT_UPSERT_SQL = """
+INSERT INTO transcript (video_id, channel_id, video_transcript)
+VALUES (?, ?, ?)
+ON CONFLICT(video_id) DO UPDATE SET
+    video_transcript = excluded.video_transcript;
+"""
+
+
+@contextmanager
+def _transaction(db_conn: sqlite3.Connection) -> Iterator[None]:
+    """
+    Run the enclosed statements in a single transaction, unless one is already open.
+
+    :param db_conn: SQLite database connection object.
+    """
+    if db_conn.in_transaction:
+        yield
+        return
+
+    db_conn.execute("BEGIN")
+    try:
+        yield
+    except Exception:
+        db_conn.execute("ROLLBACK")
+        raise
+    db_conn.execute("COMMIT")
 
-    except sqlite3.OperationalError as e:
-        logger.error(f"Error while connecting to database: {e}")
+
+def _to_rows(data: pd.DataFrame | list[tuple] | None, columns: list[str]) -> list[tuple]:
+    """
+    Convert a DataFrame to a list of row tuples; lists of tuples are passed through unchanged.
+
+    :param data: DataFrame or list of row tuples.
+    :param columns: Columns to extract, in the order of the upsert statement's placeholders.
+    :return: List of row tuples.
+    """
+    if data is None:
+        return []
+    if isinstance(data, pd.DataFrame):
+        if data.empty:
+            return []
+        return list(data[columns].itertuples(index=False, name=None))
+    return data
+
+
+def upsert_channel(db_conn: sqlite3.Connection, rows: list[tuple]) -> None:
+    """
+    Inserts or updates channel rows, ordered as in `CHANNEL_COLUMNS`.
+
+    :param db_conn: SQLite database connection object.
+    :param rows: List of channel row tuples.
+    """
+    with _transaction(db_conn):
+        db_conn.executemany(CHANNEL_UPSERT_SQL, rows)
+
+
+def upsert_videos(db_conn: sqlite3.Connection, rows: list[tuple]) -> None:
+    """
+    Inserts or updates video rows, ordered as in `VIDEO_COLUMNS`.
+
+    :param db_conn: SQLite database connection object.
+    :param rows: List of video row tuples.
+    """
+    with _transaction(db_conn):
+        db_conn.executemany(VIDEO_UPSERT_SQL, rows)
+
+
+def upsert_transcripts(db_conn: sqlite3.Connection, rows: list[tuple]) -> None:
+    """
+    Inserts or updates transcript rows, ordered as in `TRANSCRIPT_COLUMNS`.
+
+    :param db_conn: SQLite database connection object.
+    :param rows: List of transcript row tuples.
+    """
+    with _transaction(db_conn):
+        db_conn.executemany(TRANSCRIPT_UPSERT_SQL, rows)
 
 
 def upsert_data(
         db_conn: sqlite3.Connection,
-        channel_df: pd.DataFrame = None,
-        videos_df: pd.DataFrame = None,
-        transcripts_df: pd.DataFrame = None
+        channel_df: pd.DataFrame | list[tuple] = None,
+        videos_df: pd.DataFrame | list[tuple] = None,
+        transcripts_df: pd.DataFrame | list[tuple] = None
 ) -> None:
     """
     Inserts or updates data in the SQLite database for channels, videos, and transcripts.
 
     This function performs an "upsert" operation, which inserts new records or updates
-    existing ones in the database if a conflict occurs on the primary key.
+    existing ones in the database if a conflict occurs on the primary key. Each table accepts either a
+    DataFrame or a list of row tuples ordered as in `CHANNEL_COLUMNS`, `VIDEO_COLUMNS`, and `TRANSCRIPT_COLUMNS`.
 
-    :param db_conn: SQLite database connection object.
+    :param db_conn: SQLite database connection object. The connection is left open and owned by the caller.
     :param channel_df: DataFrame containing channel data with columns:
         - "channel_id": Unique identifier for the channel.
         - "channel_handle": Handle or username of the channel.
@@ -97,62 +241,28 @@ def upsert_data(
         - "video_transcript": Transcript text of the video.
 
     :return: None
+    :raises sqlite3.IntegrityError: If a row violates a constraint; the whole batch is rolled back.
     """
     logger = logging.getLogger(__name__)
-    cursor = None
 
     try:
-        cursor = db_conn.cursor()
-
-        # Upsert for channels
-        if channel_df is not None and not channel_df.empty:
-            for _, row in channel_df.iterrows():
-                cursor.execute("""
-                INSERT INTO channel (channel_id, channel_handle, channel_title, channel_subscribers, channel_description)
-                VALUES (?, ?, ?, ?, ?)
-                ON CONFLICT(channel_id) DO UPDATE SET
-                    channel_handle = excluded.channel_handle,
-                    channel_title = excluded.channel_title,
-                    channel_subscribers = excluded.channel_subscribers,
-                    channel_description = excluded.channel_description;
-                """, (row["channel_id"], row["channel_handle"], row["channel_title"],
-                      row["channel_subscribers"], row["channel_description"]))
-
-        # Upsert for videos
-        if videos_df is not None and not videos_df.empty:
-            for _, row in videos_df.iterrows():
-                cursor.execute("""
-                INSERT INTO video (video_id, channel_id, video_title, video_views, video_likes, video_comments, video_engagement, video_published_at, video_description)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(video_id) DO UPDATE SET
-                    video_title = excluded.video_title,
-                    video_views = excluded.video_views,
-                    video_likes = excluded.video_likes,
-                    video_comments = excluded.video_comments,
-                    video_engagement = excluded.video_engagement,
-                    video_published_at = excluded.video_published_at,
-                    video_description = excluded.video_description;
-                """, (row["video_id"], row["channel_id"], row["video_title"],
-                      row["video_views"], row["video_likes"], row["video_comments"],
-                      row["video_engagement"], row["video_published_at"], row["video_description"]))
-
-        # Upsert for transcripts
-        if transcripts_df is not None and not transcripts_df.empty:
-            for _, row in transcripts_df.iterrows():
-                cursor.execute("""
-                INSERT INTO transcript (video_id, channel_id, video_transcript)
-                VALUES (?, ?, ?)
-                ON CONFLICT(video_id) DO UPDATE SET
-                    video_transcript = excluded.video_transcript;
-                """, (row["video_id"], row["channel_id"], row["video_transcript"]))
-
-        db_conn.commit()
+        with _transaction(db_conn):
+            # Upsert for channels
+            channel_rows = _to_rows(channel_df, CHANNEL_COLUMNS)
+            if channel_rows:
+                upsert_channel(db_conn, channel_rows)
+
+            # Upsert for videos
+            video_rows = _to_rows(videos_df, VIDEO_COLUMNS)
+            if video_rows:
+                upsert_videos(db_conn, video_rows)
+
+            # Upsert for transcripts
+            transcript_rows = _to_rows(transcripts_df, TRANSCRIPT_COLUMNS)
+            if transcript_rows:
+                upsert_transcripts(db_conn, transcript_rows)
+
         logger.info("Successfully inserted data into database.")
 
     except sqlite3.OperationalError as e:
         logger.error(f"Error while upserting to database: {e}")
-
-    finally:
-        if cursor:
-            cursor.close()
-        db_conn.close()
@@ -1,12 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import csv
 import logging
+import os
 from pathlib import Path
+import threading
 
 from googleapiclient.discovery import build
-import googleapiclient.discovery
-import googleapiclient.errors
 import pandas as pd
 from youtube_transcript_api import YouTubeTranscriptApi
 
+from modules.database import VIDEO_COLUMNS, VIDEO_DTYPES
+
 
 class YoutubeTranscriber:
     """
@@ -18,11 +22,13 @@ class YoutubeTranscriber:
         channel_handle (str): Handle of the YouTube channel to be processed.
         tables_dir (Path): Directory to store tabular data (e.g., CSV files).
         transcripts_dir (Path): Directory to store transcript files.
+        max_workers (int): Maximum number of concurrent transcript downloads.
         logger (logging.Logger): Logger for tracking execution and errors.
-        channel_id (str): Unique identifier of the YouTube channel, fetched via the API.
+        channel_id (str): Unique identifier of the YouTube channel, fetched via the API or a previous run.
+        uploads_playlist_id (str): ID of the channel's "Uploads" playlist, fetched via the API.
 
     Methods:
-        __init__(api_key, channel_handle, tables_dir, transcripts_dir):
+        __init__(api_key, channel_handle, tables_dir, transcripts_dir, max_workers):
             Initializes the YoutubeTranscriber instance.
         _write_to_df(data, tag):
             Writes data to a Pandas DataFrame and saves it as a CSV file.
@@ -30,12 +36,12 @@ class YoutubeTranscriber:
             Stores channel metadata in DataFrame and CSV format.
         get_channel_info():
             Fetches channel metadata from the YouTube API.
-        _get_video_info(video_id):
-            Retrieves metadata for a specific video using the YouTube API.
-        _calculate_engagement_rate(views, likes, comments):
-            Calculates engagement rate for a video based on views, likes, and comments.
+        _get_video_info(video_ids):
+            Retrieves metadata for multiple videos in batches using the YouTube API.
         _store_data():
             Processes and stores video metadata and transcripts in DataFrames.
+        _fetch_one(video_id):
+            Downloads the transcript for a single video to a text file.
         get_transcripts():
             Retrieves video transcripts from the YouTube channel's upload playlist.
     """
@@ -44,6 +50,7 @@ class YoutubeTranscriber:
             channel_handle: str,
             tables_dir: Path,
             transcripts_dir: Path,
+            max_workers: int = 6,
     ) -> None:
         """
         Initialize the YoutubeTranscriber class.
@@ -52,30 +59,42 @@ class YoutubeTranscriber:
         :param channel_handle: YouTube channel handle (e.g. '@examplechannel').
         :param tables_dir: Directory to store tabular data (CSV files).
         :param transcripts_dir: Directory to store video transcript files.
+        :param max_workers: Maximum number of concurrent transcript downloads; keep it small to avoid IP blocking.
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.api_key = api_key
         self.channel_handle = channel_handle
         self.tables_dir = tables_dir
         self.transcripts_dir = transcripts_dir
+        self.max_workers = max_workers
         self.channel_id = None
+        self.uploads_playlist_id = None
+        self._yt = build("youtube", "v3", developerKey=api_key, cache_discovery=False, static_discovery=True)
+        self._n_transcripts = 0
+        self._n_transcripts_lock = threading.Lock()
 
-    def _write_to_df(self, data: list, tag: str) -> pd.DataFrame:
+    def _write_to_df(self, data: list | pd.DataFrame, tag: str) -> pd.DataFrame:
         """
-        Writes a list of dictionaries to a Pandas DataFrame and saves it as a CSV file.
+        Writes a list of dictionaries or a DataFrame to a Pandas DataFrame and saves it as a CSV file.
 
-        :param data: List of dictionaries containing data to be stored.
+        :param data: List of dictionaries or DataFrame containing data to be stored.
         :param tag: Identifier for the output file name.
         :return: DataFrame created from the input data.
         """
         try:
-            df = pd.DataFrame(data).replace("\n", " ", regex=True)
+            df = pd.DataFrame(data)
+            # Literal replacement on text columns only; numeric columns are left untouched
+            for col in df.select_dtypes(include=["object", "string"]).columns:
+                # `.str.replace` yields NaN for non-str cells in mixed columns; restore the original values
+                df[col] = df[col].str.replace("\n", " ", regex=False).fillna(df[col])
             if "published_at" in df.columns:
-                df = df.sort_values(["published_at"], ascending=False).reset_index(drop=True)
+                df = df.sort_values("published_at", ascending=False, ignore_index=True)
             else:
                 self.logger.warning("Warning: 'published_at' column is missing. DataFrame will not be sorted by this column.")
-            df = df.drop_duplicates()
-            df.to_csv(f"{self.tables_dir}/{self.channel_handle}_{tag}.csv", index=False, encoding="utf-8")
+            df = df.drop_duplicates(ignore_index=True)
+            df.to_csv(
+                f"{self.tables_dir}/{self.channel_handle}_{tag}.csv", index=False, encoding="utf-8", lineterminator="\n"
+            )
             return df
         except Exception as e:
             self.logger.error(f"Error creating DataFrame: {e}")
@@ -99,12 +118,17 @@ class YoutubeTranscriber:
             channel_data = {
                 "channel_id": self.channel_id,
                 "channel_handle": self.channel_handle,
-                "channel_title": title,
+                "channel_title": title.replace("\n", " "),
                 "channel_subscribers": n_subscribers,
-                "channel_description": description
+                "channel_description": description.replace("\n", " ")
             }
 
-            df = self._write_to_df([channel_data], "channel")
+            # Single row, so skip the DataFrame round trip and write the CSV directly
+            with open(f"{self.tables_dir}/{self.channel_handle}_channel.csv", "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=channel_data.keys(), lineterminator="\n")
+                writer.writeheader()
+                writer.writerow(channel_data)
+            df = pd.DataFrame([channel_data])
 
             self.logger.info(
                 f"Finished storing channel info for @{self.channel_handle}."
@@ -122,16 +146,17 @@ class YoutubeTranscriber:
         :return: DataFrame containing the channel metadata (title, subscribers, description, etc.).
         """
         try:
-            youtube = build(
-                "youtube",
-                "v3",
-                developerKey=self.api_key,
-                cache_discovery=False
-            )
-            request = youtube.channels().list(
-                part="snippet,statistics",
-                forHandle=self.channel_handle
-            )
+            # Look up by ID if it is already known, otherwise resolve the handle
+            if self.channel_id:
+                request = self._yt.channels().list(
+                    part="snippet,statistics,contentDetails",
+                    id=self.channel_id
+                )
+            else:
+                request = self._yt.channels().list(
+                    part="snippet,statistics,contentDetails",
+                    forHandle=self.channel_handle
+                )
             response = request.execute()
 
             if response.get("items"):
@@ -141,6 +166,11 @@ class YoutubeTranscriber:
                 # Snippet details
                 snippet = item.get("snippet", {})
                 self.channel_id = item.get("id", "Unknown Channel ID")
+                self.uploads_playlist_id = (
+                    item.get("contentDetails", {})
+                    .get("relatedPlaylists", {})
+                    .get("uploads")
+                )
                 channel_title = snippet.get("title", "Unknown Channel Title")
                 channel_description = snippet.get("description", "")
 
@@ -165,65 +195,46 @@ class YoutubeTranscriber:
 
     def _get_video_info(
             self,
-            video_id: str
-    ) -> tuple[str, str, str, int, int, int] | tuple[None, None, None, None, None, None]:
+            video_ids: list[str]
+    ) -> dict[str, tuple[str, str, str, int, int, int]]:
         """
-        Retrieves metadata for a specific video using the YouTube API.
+        Retrieves metadata for multiple videos using the YouTube API, requesting up to 50 IDs per call.
 
-        :param video_id: Video ID for which to retrieve information.
-        :return: Tuple containing video title, description, published date, views, likes, and comments.
+        :param video_ids: Video IDs for which to retrieve information.
+        :return: Dictionary mapping each found video ID to a tuple containing video title, description,
+            published date, views, likes, and comments.
         """
         try:
-            youtube = build("youtube", "v3", developerKey=self.api_key)
-            request = youtube.videos().list(
-                part="snippet,statistics",
-                id=video_id
-            )
-            response = request.execute()
-            if response.get("items"):
-                # First item
-                item = response.get("items", [{}])[0]
-
-                # Snippet details
-                snippet = item.get("snippet", {})
-                title = snippet.get("title", "Unknown Title")
-                description = snippet.get("description", "No Description")
-                published_at = snippet.get("publishedAt", "Unknown Publish Date")
+            video_info = {}
+            for chunk in (video_ids[i:i + 50] for i in range(0, len(video_ids), 50)):
+                request = self._yt.videos().list(
+                    part="snippet,statistics",
+                    id=",".join(chunk)
+                )
+                response = request.execute()
 
-                # Statistics details
-                statistics = item.get("statistics", {})
-                video_n_views = int(statistics.get("viewCount", 0))
-                video_n_likes = int(statistics.get("likeCount", 0))
-                video_n_comments = int(statistics.get("commentCount", 0))
+                for item in response.get("items", []):
+                    # Snippet details
+                    snippet = item.get("snippet", {})
+                    title = snippet.get("title", "Unknown Title")
+                    description = snippet.get("description", "No Description")
+                    published_at = snippet.get("publishedAt", "Unknown Publish Date")
+
+                    # Statistics details
+                    statistics = item.get("statistics", {})
+                    video_n_views = int(statistics.get("viewCount", 0))
+                    video_n_likes = int(statistics.get("likeCount", 0))
+                    video_n_comments = int(statistics.get("commentCount", 0))
+
+                    video_info[item.get("id")] = (
+                        title, description, published_at, video_n_views, video_n_likes, video_n_comments
+                    )
 
-                return title, description, published_at, video_n_views, video_n_likes, video_n_comments
-            else:
-                self.logger.warning(f"No video found for ID {video_id}. Returning None values.")
-                return None, None, None, None, None, None
+            return video_info
         except Exception as e:
             self.logger.error(f"Error retrieving info for channel {self.channel_handle}: {e}", exc_info=True)
             raise
 
-    def _calculate_engagement_rate(
-            self,
-            views: int,
-            likes: int,
-            comments: int
-    ) -> float | None:
-        """
-        Calculates engagement rate for a video based on views, likes, and comments.
-
-        :param views: Number of views for the video.
-        :param likes: Number of likes on the video.
-        :param comments: Number of comments on the video.
-        :return: Engagement rate as a percentage, or None if views are zero.
-        """
-        try:
-            return ((likes + comments) / views) * 100
-        except Exception as e:
-            self.logger.error(f"Error calculating engagement rate: {e}", exc_info=True)
-            raise
-
     def _store_data(self) -> tuple[pd.DataFrame, pd.DataFrame]:
         """
         Processes and stores video metadata and transcripts in DataFrames.
@@ -234,49 +245,57 @@ class YoutubeTranscriber:
             video_data = []
             transcripts_data = []
 
-            for file in self.transcripts_dir.iterdir():
-                if file.suffix == ".txt":
-                    try:
-                        with open(file, "r", encoding="utf-8") as f:
-                            video_transcript = f.read()
-                    except UnicodeDecodeError as e:
-                        self.logger.error(f"Error reading file {file}: {e}", exc_info=True)
-                        continue
-
-                    # Get video info
-                    filename = file.stem
-                    title, description, published_at, video_n_views, video_n_likes, video_n_comments = self._get_video_info(
-                        filename
-                    )
-                    video_engagement = self._calculate_engagement_rate(
-                        views=video_n_views,
-                        likes=video_n_likes,
-                        comments=video_n_comments
-                    )
-                    # Append to data with consistent keys
-                    video_data.append(
-                        {
-                            "video_id": filename,
-                            "channel_id": self.channel_id,
-                            "video_title": title,
-                            "video_views": video_n_views,
-                            "video_likes": video_n_likes,
-                            "video_comments": video_n_comments,
-                            "video_engagement": video_engagement,
-                            "video_published_at": published_at,
-                            "video_description": description,
-                        }
+            transcripts = []
+            with os.scandir(self.transcripts_dir) as it:
+                entries = [entry for entry in it if entry.name.endswith(".txt")]
+
+            for entry in entries:
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        transcripts.append((entry.name[:-4], f.read()))
+                except UnicodeDecodeError as e:
+                    self.logger.error(f"Error reading file {entry.path}: {e}", exc_info=True)
+                    continue
+
+            # Get video info for all transcripts in batches
+            video_info = self._get_video_info([filename for filename, _ in transcripts])
+
+            for filename, video_transcript in transcripts:
+                if filename not in video_info:
+                    self.logger.warning(f"No video found for ID {filename}. Skipping video and transcript.")
+                    continue
+                title, description, published_at, video_n_views, video_n_likes, video_n_comments = video_info[filename]
+                # Append to data in `VIDEO_COLUMNS` order
+                video_data.append(
+                    (
+                        filename,
+                        self.channel_id,
+                        title,
+                        video_n_views,
+                        video_n_likes,
+                        video_n_comments,
+                        None,
+                        published_at,
+                        description,
                     )
+                )
 
-                    transcripts_data.append(
-                        {
-                            "video_id": filename,
-                            "channel_id": self.channel_id,
-                            "video_transcript": video_transcript
-                        }
-                    )
+                transcripts_data.append(
+                    {
+                        "video_id": filename,
+                        "channel_id": self.channel_id,
+                        "video_transcript": video_transcript
+                    }
+                )
+
+            videos_df = pd.DataFrame.from_records(video_data, columns=VIDEO_COLUMNS).astype(VIDEO_DTYPES)
+            # Engagement rate as a percentage, computed column-wise; zero views yield NaN
+            views = videos_df["video_views"].where(videos_df["video_views"] != 0)
+            videos_df["video_engagement"] = (
+                (videos_df["video_likes"] + videos_df["video_comments"]).div(views).mul(100)
+            )
 
-            videos_df = self._write_to_df(video_data, "videos")
+            videos_df = self._write_to_df(videos_df, "videos")
             transcripts_df = self._write_to_df(transcripts_data, "transcripts")
             return videos_df, transcripts_df
 
@@ -284,6 +303,30 @@ class YoutubeTranscriber:
             self.logger.error(f"Error processing data from channel {self.channel_handle}: {e}", exc_info=True)
             raise
 
+    def _fetch_one(self, video_id: str) -> bool:
+        """
+        Downloads the transcript for a single video and writes it to a text file.
+
+        :param video_id: Video ID for which to download the transcript.
+        :return: True if a transcript was written, False otherwise.
+        """
+        transcript_file = f"{self.transcripts_dir}/{video_id}.txt"
+        try:
+            transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+            for transcript in transcript_list:
+                transcript_data = transcript.fetch()
+                text = "\n".join(segment["text"] for segment in transcript_data)
+                Path(transcript_file).write_text(text, encoding="utf-8")
+                with self._n_transcripts_lock:
+                    self._n_transcripts += 1
+                    n_transcripts = self._n_transcripts
+                self.logger.info(f"Downloaded transcript #{n_transcripts} for video ID {video_id} to {transcript_file}.")
+                # Only the first available transcript is kept
+                return True
+        except Exception as e:
+            self.logger.warning(f"Could not download transcripts for video {video_id}: {e}")
+        return False
+
     def get_transcripts(self) -> tuple[pd.DataFrame, pd.DataFrame]:
         """
         Retrieves video transcripts from the YouTube channel's upload playlist.
@@ -291,69 +334,67 @@ class YoutubeTranscriber:
         :return: Tuple of DataFrames containing video metadata and transcripts.
         """
         try:
-            youtube = googleapiclient.discovery.build(
-                "youtube",
-                "v3",
-                developerKey=self.api_key
-            )
-
-            # Get the ID of the channel's "Uploads" playlist
-            request = youtube.channels().list(
-                part="contentDetails",
-                id=self.channel_id
-            )
+            # Get the ID of the channel's "Uploads" playlist unless `get_channel_info` already did
+            uploads_playlist_id = self.uploads_playlist_id
+            if uploads_playlist_id is None:
+                request = self._yt.channels().list(
+                    part="contentDetails",
+                    id=self.channel_id
+                )
+                response = request.execute()
+                uploads_playlist_id = (
+                    response.get("items", [{}])[0]
+                    .get("contentDetails", {})
+                    .get("relatedPlaylists", {})
+                    .get("uploads", "No Uploads Playlist")
+                )
 
-            response = request.execute()
             self.logger.info(f"Downloading transcripts for channel {self.channel_handle}.")
 
-            uploads_playlist_id = (
-                response.get("items", [{}])[0]
-                .get("contentDetails", {})
-                .get("relatedPlaylists", {})
-                .get("uploads", "No Uploads Playlist")
-            )
-
             # Get all video IDs from the "uploads" playlist and fetch transcripts
             video_ids = []
             next_page_token = None
-            n_transcripts = 0
+            self._n_transcripts = 0
+
+            # Scan once for transcripts downloaded by previous runs
+            with os.scandir(self.transcripts_dir) as it:
+                existing_ids = {entry.name[:-4] for entry in it if entry.name.endswith(".txt")}
+
+            # Downloads are network-bound, so overlap them across pages; keep the pool small to avoid IP blocking
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {}
+                queued_ids = set()
+
+                while True:
+                    request = self._yt.playlistItems().list(
+                        part="contentDetails",
+                        playlistId=uploads_playlist_id,
+                        maxResults=50,
+                        pageToken=next_page_token
+                    )
 
-            while True:
-                request = youtube.playlistItems().list(
-                    part="contentDetails",
-                    playlistId=uploads_playlist_id,
-                    maxResults=50,
-                    pageToken=next_page_token
-                )
+                    response = request.execute()
 
-                response = request.execute()
+                    for item in response.get("items"):
+                        video_id = item.get("contentDetails", {}).get("videoId", "No Video ID")
+                        video_ids.append(video_id)
+
+                        if video_id in existing_ids:
+                            self.logger.info(f"Transcript file already exists: {self.transcripts_dir}/{video_id}.txt")
+                        elif video_id not in queued_ids:
+                            queued_ids.add(video_id)
+                            futures[executor.submit(self._fetch_one, video_id)] = video_id
+
+                    next_page_token = response.get("nextPageToken")
+                    if next_page_token is None:
+                        break
 
-                for item in response.get("items"):
-                    video_id = item.get("contentDetails", {}).get("videoId", "No Video ID")
-                    video_ids.append(video_id)
-
-                    transcript_file = f"{self.transcripts_dir}/{video_id}.txt"
-                    if not Path(transcript_file).is_file():
-                        try:
-                            transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-                            for transcript in transcript_list:
-                                transcript_data = transcript.fetch()
-                                with open(transcript_file, "w", encoding="utf-8") as f:
-                                    for line in transcript_data:
-                                        f.write(line["text"] + "\n")
-                                n_transcripts += 1
-                                self.logger.info(f"Downloaded transcript #{n_transcripts} for video ID {video_id} to {transcript_file}.")
-                        except Exception as e:
-                            self.logger.warning(f"Could not download transcripts for video {video_id}: {e}")
-                    else:
-                        self.logger.info(f"Transcript file already exists: {transcript_file}")
-
-                next_page_token = response.get("nextPageToken")
-                if next_page_token is None:
-                    break
+                for future in as_completed(futures):
+                    if future.result():
+                        existing_ids.add(futures[future])
 
             self.logger.info(
-                f"Finished retrieving {n_transcripts} transcripts for channel @{self.channel_handle}."
+                f"Finished retrieving {self._n_transcripts} transcripts for channel @{self.channel_handle}."
             )
             return self._store_data()
 
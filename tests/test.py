@@ -1,4 +1,5 @@
 from pathlib import Path
+import sqlite3
 
 import pandas as pd
 
@@ -55,3 +56,22 @@ database_setup(
     videos_df=video_df,
     transcripts_df=transcript_df
 )
+
+# Same data as lists of row tuples
+database_setup(
+    db_dir=db_dir,
+    channel_df=[("123", "@example", "Example Channel", 1000, "A great channel")],
+    videos_df=[("v1", "123", "First Video", 100, 10, 5, 15.0, "2023-11-01", "An amazing video")],
+    transcripts_df=[("v1", "123", "Hello world!")]
+)
+
+# Transcripts for unknown videos violate the foreign key and roll back the whole batch
+try:
+    database_setup(
+        db_dir=db_dir,
+        transcripts_df=[("v_missing", "123", "Orphaned transcript")]
+    )
+except sqlite3.IntegrityError:
+    pass
+else:
+    raise AssertionError("Expected sqlite3.IntegrityError for a transcript without a video.")